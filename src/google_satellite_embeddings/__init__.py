@@ -4,11 +4,13 @@ __version__ = "0.1.0"
 
 from .clustering import ClusteringAnalysis
 from .change_detection import ChangeDetectionAnalysis
-from .utils import setup_ee, get_satellite_embeddings
+from .utils import setup_ee, get_satellite_embeddings, normalize_embeddings, quantize_embeddings
 
 __all__ = [
     "ClusteringAnalysis",
     "ChangeDetectionAnalysis",
     "setup_ee",
     "get_satellite_embeddings",
+    "normalize_embeddings",
+    "quantize_embeddings",
 ]
@@ -0,0 +1,158 @@
+"""Numba-accelerated kernels for local post-processing of exported rasters."""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+
+def _to_soa_f32(arr: np.ndarray) -> np.ndarray:
+    """
+    Convert a (B, H, W) raster cube to a contiguous (H*W, B) float32 array.
+
+    rasterio yields rasters band-major, but the local kernels want one
+    contiguous embedding vector per pixel so SIMD loads stay on a single
+    cache line. This also downcasts float64 inputs to float32, halving
+    the bytes moved through the reduction.
+
+    Args:
+        arr: Embedding cube of shape (bands, height, width)
+
+    Returns:
+        Contiguous float32 array of shape (height * width, bands)
+    """
+    n_bands = arr.shape[0]
+    return np.ascontiguousarray(arr.transpose(1, 2, 0).reshape(-1, n_bands), dtype=np.float32)
+
+
+def _cosine_rows(a, b, out):
+    """Row-wise cosine similarity between paired (N, B) float32 arrays."""
+    n_rows, n_bands = a.shape
+    for i in prange(n_rows):
+        dot = np.float32(0.0)
+        na = np.float32(0.0)
+        nb = np.float32(0.0)
+        for k in range(n_bands):
+            ai = a[i, k]
+            bi = b[i, k]
+            dot += ai * bi
+            na += ai * ai
+            nb += bi * bi
+        den = np.sqrt(na * nb)
+        if den > 0.0:
+            out[i] = dot / den
+        else:
+            out[i] = np.nan
+
+
+def _cosine_batch_rows(stack, out):
+    """Cosine similarity between consecutive time steps of a (T, N, B) stack."""
+    n_steps = stack.shape[0] - 1
+    n_rows = stack.shape[1]
+    n_bands = stack.shape[2]
+    for i in prange(n_rows):
+        # The norm of time t doubles as the 'previous' norm at t+1, so each
+        # vector's self-product is computed once across the whole sweep
+        na = np.float32(0.0)
+        for k in range(n_bands):
+            ai = stack[0, i, k]
+            na += ai * ai
+        for t in range(n_steps):
+            dot = np.float32(0.0)
+            nb = np.float32(0.0)
+            for k in range(n_bands):
+                ai = stack[t, i, k]
+                bi = stack[t + 1, i, k]
+                dot += ai * bi
+                nb += bi * bi
+            den = np.sqrt(na * nb)
+            if den > 0.0:
+                out[t, i] = dot / den
+            else:
+                out[t, i] = np.nan
+            na = nb
+
+
+if njit is not None:
+    _cosine_rows = njit(parallel=True, fastmath=True, cache=True)(_cosine_rows)
+    _cosine_batch_rows = njit(parallel=True, fastmath=True, cache=True)(_cosine_batch_rows)
+
+
+def cosine_rows(a_rows: np.ndarray, b_rows: np.ndarray) -> np.ndarray:
+    """
+    Compute row-wise cosine similarity between paired (N, B) float32 arrays.
+
+    Inputs must already be contiguous float32 rows, e.g. from _to_soa_f32.
+
+    Args:
+        a_rows: First array of per-pixel embedding rows, shape (N, bands)
+        b_rows: Second array of per-pixel embedding rows, shape (N, bands)
+
+    Returns:
+        Array of shape (N,) with cosine similarity values
+
+    Raises:
+        ImportError: If numba is not installed
+    """
+    if njit is None:
+        raise ImportError(
+            "numba is required for cosine_rows; "
+            "install it with: pip install google-satellite-embeddings[perf]"
+        )
+    if a_rows.shape != b_rows.shape:
+        raise ValueError(f"Shape mismatch: {a_rows.shape} vs {b_rows.shape}")
+
+    out = np.empty(a_rows.shape[0], dtype=np.float32)
+    _cosine_rows(a_rows, b_rows, out)
+    return out
+
+
+def cosine_batch(stack_rows: np.ndarray) -> np.ndarray:
+    """
+    Compute cosine similarity between consecutive time steps of a row stack.
+
+    Args:
+        stack_rows: Contiguous float32 array of shape (T, N, bands), one
+            (N, bands) row layout per time step (see _to_soa_f32)
+
+    Returns:
+        Array of shape (T-1, N) with cosine similarity between steps t and t+1
+
+    Raises:
+        ImportError: If numba is not installed
+    """
+    if njit is None:
+        raise ImportError(
+            "numba is required for cosine_batch; "
+            "install it with: pip install google-satellite-embeddings[perf]"
+        )
+    n_times, n_rows, _ = stack_rows.shape
+    out = np.empty((n_times - 1, n_rows), dtype=np.float32)
+    _cosine_batch_rows(stack_rows, out)
+    return out
+
+
+def cosine_stack(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Compute per-pixel cosine similarity between two (H, W, B) embedding stacks.
+
+    Args:
+        a: First embedding stack of shape (height, width, bands)
+        b: Second embedding stack of shape (height, width, bands)
+
+    Returns:
+        Array of shape (height, width) with cosine similarity values
+
+    Raises:
+        ImportError: If numba is not installed
+    """
+    if a.shape != b.shape:
+        raise ValueError(f"Shape mismatch: {a.shape} vs {b.shape}")
+
+    height, width, n_bands = a.shape
+    a_rows = np.ascontiguousarray(a.reshape(-1, n_bands), dtype=np.float32)
+    b_rows = np.ascontiguousarray(b.reshape(-1, n_bands), dtype=np.float32)
+    return cosine_rows(a_rows, b_rows).reshape(height, width)
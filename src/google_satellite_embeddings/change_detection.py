@@ -1,12 +1,67 @@
 """Change detection analysis using satellite embeddings."""
 
+import os
+
 import ee
-import geemap
 import numpy as np
-import rasterio
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
+
+# geemap, rasterio and matplotlib are imported lazily inside the export and
+# visualization paths so server-side-only use avoids their import cost
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+from . import _kernels
+
+
+def _run_tiled(
+    func: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    a: np.ndarray,
+    b: np.ndarray,
+    tile: int = 512,
+    workers: Optional[int] = None
+) -> np.ndarray:
+    """
+    Apply a (B, h, w) -> (h, w) change kernel over spatial tiles in parallel.
+
+    Per-pixel change metrics are independent across pixels, so the raster is
+    chunked into tile x tile windows and dispatched on a thread pool (the
+    NumPy/SimSIMD/Numba kernels release the GIL). Each task writes its block
+    into a preallocated output.
+
+    Args:
+        func: Kernel taking two (bands, h, w) cubes and returning (h, w)
+        a: First embedding cube of shape (bands, height, width)
+        b: Second embedding cube of shape (bands, height, width)
+        tile: Tile edge length in pixels
+        workers: Thread count (defaults to os.cpu_count())
+
+    Returns:
+        Array of shape (height, width) assembled from the tile results
+    """
+    _, height, width = a.shape
+    out = np.empty((height, width), dtype=np.float32)
+
+    def _one_tile(y: int, x: int) -> None:
+        ys = slice(y, min(y + tile, height))
+        xs = slice(x, min(x + tile, width))
+        out[ys, xs] = func(a[:, ys, xs], b[:, ys, xs])
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(_one_tile, y, x)
+            for y in range(0, height, tile)
+            for x in range(0, width, tile)
+        ]
+        for future in futures:
+            future.result()
+
+    return out
 
 
 class ChangeDetectionAnalysis:
@@ -44,22 +99,69 @@ class ChangeDetectionAnalysis:
             .reduce(ee.Reducer.mean())
         )
 
-    def compute_cosine_similarity(self) -> ee.Image:
+    @staticmethod
+    def compute_mad_local(
+        arr1: np.ndarray,
+        arr2: np.ndarray,
+        strip_rows: int = 1024
+    ) -> np.ndarray:
+        """
+        Compute per-pixel mean absolute difference on local rasters.
+
+        Local counterpart to compute_mean_absolute_difference for users who
+        already have both exports on disk. Works strip-by-strip through a
+        single preallocated difference buffer, so large rasters never
+        materialize the subtract/abs/mean temporaries at full size.
+
+        Args:
+            arr1: First embedding cube of shape (bands, height, width)
+            arr2: Second embedding cube of shape (bands, height, width)
+            strip_rows: Number of raster rows processed per strip
+
+        Returns:
+            Array of shape (height, width) with mean absolute difference values
+        """
+        if arr1.shape != arr2.shape:
+            raise ValueError(f"Shape mismatch: {arr1.shape} vs {arr2.shape}")
+
+        n_bands, height, width = arr1.shape
+        out = np.empty((height, width), dtype=np.float32)
+        diff = np.empty((n_bands, min(strip_rows, height), width), dtype=np.float32)
+
+        for y in range(0, height, strip_rows):
+            stop = min(y + strip_rows, height)
+            buf = diff[:, :stop - y, :]
+            np.subtract(arr2[:, y:stop, :], arr1[:, y:stop, :], out=buf)
+            np.abs(buf, out=buf)
+            out[y:stop, :] = buf.mean(axis=0)
+
+        return out
+
+    def compute_cosine_similarity(self, assume_normalized: bool = False) -> ee.Image:
         """
         Compute cosine similarity between embeddings.
 
+        Args:
+            assume_normalized: If True, treat both embeddings as unit-norm
+                (e.g. pre-processed with utils.normalize_embeddings) and skip
+                the norm computation entirely
+
         Returns:
             Single-band image with cosine similarity values [-1, 1]
         """
-        a = self.embeddings_t1.toArray()
-        b = self.embeddings_t2.toArray()
+        # Stay in multi-band image space: per-pixel Array images blow past
+        # GEE's tile memory limits on wide embeddings, while band-wise
+        # reductions keep the planner on its lean per-band tile pipelines
+        a = self.embeddings_t1
+        b = self.embeddings_t2
 
-        # Dot product
-        dot = a.multiply(b).arrayReduce(ee.Reducer.sum(), [0]).arrayGet([0])
+        dot = a.multiply(b).reduce(ee.Reducer.sum())
 
-        # Norms
-        na = a.multiply(a).arrayReduce(ee.Reducer.sum(), [0]).arrayGet([0]).sqrt()
-        nb = b.multiply(b).arrayReduce(ee.Reducer.sum(), [0]).arrayGet([0]).sqrt()
+        if assume_normalized:
+            return dot.clamp(-1, 1).rename('cosine')
+
+        na = a.pow(2).reduce(ee.Reducer.sum()).sqrt()
+        nb = b.pow(2).reduce(ee.Reducer.sum()).sqrt()
 
         # Cosine similarity (avoid divide-by-zero)
         den = na.multiply(nb)
@@ -67,6 +169,121 @@ class ChangeDetectionAnalysis:
 
         return cos
 
+    @staticmethod
+    def compute_cosine_similarity_local(arr1: np.ndarray, arr2: np.ndarray) -> np.ndarray:
+        """
+        Compute per-pixel cosine similarity between two exported embedding rasters.
+
+        Unlike compute_cosine_similarity, this runs entirely on local arrays
+        (e.g. the output of rasterio.read() on two exports), avoiding any
+        Earth Engine round-trips. Uses SimSIMD's fused dot+norm kernels when
+        available and falls back to a NumPy einsum otherwise.
+
+        Args:
+            arr1: First embedding cube of shape (bands, height, width)
+            arr2: Second embedding cube of shape (bands, height, width)
+
+        Returns:
+            Array of shape (height, width) with cosine similarity values [-1, 1]
+        """
+        if arr1.shape != arr2.shape:
+            raise ValueError(f"Shape mismatch: {arr1.shape} vs {arr2.shape}")
+
+        n_bands, height, width = arr1.shape
+
+        # Quantized exports (see utils.quantize_embeddings) can stay int8 all
+        # the way into SimSIMD's i8 kernel, halving traffic vs float32
+        if simsimd is not None and arr1.dtype == np.int8 and arr2.dtype == np.int8:
+            a = np.ascontiguousarray(arr1.transpose(1, 2, 0).reshape(-1, n_bands))
+            b = np.ascontiguousarray(arr2.transpose(1, 2, 0).reshape(-1, n_bands))
+        else:
+            a = _kernels._to_soa_f32(arr1)
+            b = _kernels._to_soa_f32(arr2)
+
+        if simsimd is not None:
+            dist = np.asarray(simsimd.cosine(a, b), dtype=np.float32).reshape(-1)
+            cos = 1.0 - dist
+        else:
+            dot = np.einsum('ij,ij->i', a, b)
+            norms = np.sqrt(np.einsum('ij,ij->i', a, a) * np.einsum('ij,ij->i', b, b))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cos = dot / norms
+            cos[~np.isfinite(cos)] = np.nan
+
+        return np.clip(cos, -1, 1).reshape(height, width)
+
+    @staticmethod
+    def compute_cosine_similarity_numba(arr1: np.ndarray, arr2: np.ndarray) -> np.ndarray:
+        """
+        Compute per-pixel cosine similarity with the parallel Numba kernel.
+
+        Useful for batched local post-processing (thresholding, morphology,
+        many year-pairs) where the JIT compilation cost amortizes across
+        calls. Requires numba; see compute_cosine_similarity_local for a
+        dependency-light alternative.
+
+        Args:
+            arr1: First embedding cube of shape (bands, height, width)
+            arr2: Second embedding cube of shape (bands, height, width)
+
+        Returns:
+            Array of shape (height, width) with cosine similarity values [-1, 1]
+        """
+        _, height, width = arr1.shape
+        cos = _kernels.cosine_rows(_kernels._to_soa_f32(arr1), _kernels._to_soa_f32(arr2))
+        return cos.reshape(height, width)
+
+    @staticmethod
+    def compute_change_tiled(
+        kernel: Callable[[np.ndarray, np.ndarray], np.ndarray],
+        arr1: np.ndarray,
+        arr2: np.ndarray,
+        tile: int = 512,
+        workers: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Run a local change kernel tile-parallel over two embedding cubes.
+
+        Pass compute_cosine_similarity_local or compute_mad_local as the
+        kernel; each 512x512 tile fits comfortably in cache and the tiles
+        run concurrently, scaling near-linearly with cores.
+
+        Args:
+            kernel: Change kernel taking two (bands, h, w) cubes
+            arr1: First embedding cube of shape (bands, height, width)
+            arr2: Second embedding cube of shape (bands, height, width)
+            tile: Tile edge length in pixels
+            workers: Thread count (defaults to os.cpu_count())
+
+        Returns:
+            Array of shape (height, width) with the kernel's output
+        """
+        if arr1.shape != arr2.shape:
+            raise ValueError(f"Shape mismatch: {arr1.shape} vs {arr2.shape}")
+        return _run_tiled(kernel, arr1, arr2, tile=tile, workers=workers)
+
+    @staticmethod
+    def batch_change(stack: np.ndarray) -> np.ndarray:
+        """
+        Compute cosine change maps across a multi-year embedding stack.
+
+        For N years this replaces N-1 independent cosine calls with one
+        parallel sweep that keeps each year's per-pixel norm warm for the
+        following pair, halving the redundant band reads.
+
+        Args:
+            stack: Embedding stack of shape (times, bands, height, width)
+
+        Returns:
+            Array of shape (times - 1, height, width) with cosine similarity
+            between each pair of consecutive time steps
+        """
+        n_times, n_bands, height, width = stack.shape
+        rows = np.empty((n_times, height * width, n_bands), dtype=np.float32)
+        for t in range(n_times):
+            rows[t] = _kernels._to_soa_f32(stack[t])
+        return _kernels.cosine_batch(rows).reshape(n_times - 1, height, width)
+
     def export_change_map(
         self,
         change_image: ee.Image,
@@ -84,6 +301,8 @@ class ChangeDetectionAnalysis:
         Returns:
             Path to exported file
         """
+        import geemap
+
         geemap.ee_export_image(
             change_image,
             str(output_path),
@@ -92,6 +311,83 @@ class ChangeDetectionAnalysis:
         )
         return output_path
 
+    def export_change_map_tiled(
+        self,
+        change_image: ee.Image,
+        output_dir: Path,
+        tile_size_deg: float = 0.1,
+        overlap_deg: float = 0.005,
+        scale: int = 10,
+        max_workers: int = 8
+    ) -> Path:
+        """
+        Export a change map as concurrent tiles and merge them locally.
+
+        geemap.ee_export_image is a synchronous per-image download, so a
+        single large region serializes on the export queue. Splitting the
+        region into overlapping tiles lets the downloads run concurrently,
+        after which the tiles are mosaicked back into one GeoTIFF.
+
+        Args:
+            change_image: Change detection image to export
+            output_dir: Directory for tile files and the merged output
+            tile_size_deg: Tile edge length in degrees
+            overlap_deg: Overlap padding between adjacent tiles in degrees
+            scale: Scale in meters for export
+            max_workers: Number of concurrent export downloads
+
+        Returns:
+            Path to the merged GeoTIFF
+        """
+        import geemap
+        import rasterio
+        import rasterio.merge
+
+        coords = self.region.bounds().getInfo()['coordinates'][0]
+        lons = [c[0] for c in coords]
+        lats = [c[1] for c in coords]
+        xmin, xmax = min(lons), max(lons)
+        ymin, ymax = min(lats), max(lats)
+
+        tiles = []
+        x = xmin
+        while x < xmax:
+            y = ymin
+            while y < ymax:
+                tiles.append(ee.Geometry.Rectangle([
+                    max(xmin, x - overlap_deg),
+                    max(ymin, y - overlap_deg),
+                    min(xmax, x + tile_size_deg + overlap_deg),
+                    min(ymax, y + tile_size_deg + overlap_deg)
+                ]))
+                y += tile_size_deg
+            x += tile_size_deg
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        tile_paths = [output_dir / f"tile_{i:04d}.tif" for i in range(len(tiles))]
+
+        def _export_tile(tile: ee.Geometry, path: Path) -> Path:
+            geemap.ee_export_image(change_image, str(path), scale=scale, region=tile)
+            return path
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(_export_tile, tiles, tile_paths))
+
+        sources = [rasterio.open(p) for p in tile_paths]
+        try:
+            mosaic, transform = rasterio.merge.merge(sources)
+            meta = sources[0].meta.copy()
+            meta.update(height=mosaic.shape[1], width=mosaic.shape[2], transform=transform)
+        finally:
+            for src in sources:
+                src.close()
+
+        merged_path = output_dir / "change_map.tif"
+        with rasterio.open(merged_path, "w", **meta) as dst:
+            dst.write(mosaic)
+        return merged_path
+
     @staticmethod
     def visualize_change_map(
         tif_path: Path,
@@ -119,8 +415,24 @@ class ChangeDetectionAnalysis:
         Returns:
             Path to output PNG if output_path provided, None otherwise
         """
+        import rasterio
+        import matplotlib.pyplot as plt
+
         with rasterio.open(tif_path) as src:
-            arr = src.read(1)
+            # Decimate on read: the figure can only show figsize * dpi pixels,
+            # so there is no point loading a full continental-scale raster.
+            # One common factor shrinks both axes proportionally, keeping the
+            # raster's own aspect ratio rather than the figure's
+            factor = max(
+                1.0,
+                src.height / (figsize[1] * dpi),
+                src.width / (figsize[0] * dpi)
+            )
+            arr = src.read(
+                1,
+                out_shape=(round(src.height / factor), round(src.width / factor)),
+                resampling=rasterio.enums.Resampling.average
+            )
 
         fig = plt.figure(figsize=figsize)
         plt.imshow(arr, cmap=cmap, vmin=vmin, vmax=vmax)
@@ -1,14 +1,33 @@
 """K-means clustering analysis for satellite embeddings."""
 
+import hashlib
+import os
+import subprocess
+import time
+
 import ee
-import geemap
-import geemap.foliumap as geefolium
 import numpy as np
-import rasterio
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple
-from matplotlib.colors import ListedColormap, BoundaryNorm
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+# geemap, rasterio and matplotlib are imported lazily inside the functions
+# that need them: pulling in folium/ipyleaflet and the matplotlib font
+# manager costs hundreds of milliseconds even for purely server-side use
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+    import rasterio.windows
+
+try:
+    from sklearn.cluster import MiniBatchKMeans
+except ImportError:
+    MiniBatchKMeans = None
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
 
 
 # Kelly's 22 maximally distinct colors
@@ -19,6 +38,49 @@ KELLY_COLORS = [
 ]
 
 
+# Memoized sampling results keyed on (image, region, params); sampling is by
+# far the most expensive step when several ClusteringAnalysis instances are
+# built over the same inputs
+_training_cache = {}
+
+
+@lru_cache(maxsize=32)
+def _palette_for_k(k: int) -> np.ndarray:
+    """
+    Build a uint8 RGBA lookup table for the first k Kelly colors.
+
+    Memoized so panels sharing a K value reuse one table instead of
+    re-parsing the hex colors per panel.
+
+    Args:
+        k: Number of clusters
+
+    Returns:
+        Array of shape (k, 4) suitable for fancy-indexing a label raster
+    """
+    from matplotlib.colors import to_rgba
+
+    return (np.array([to_rgba(c) for c in KELLY_COLORS[:k]]) * 255).astype(np.uint8)
+
+
+@lru_cache(maxsize=64)
+def _region_bounds(serialized_region: str) -> dict:
+    """
+    Resolve region bounds with a cache over the serialized geometry.
+
+    Each bounds().getInfo() is a synchronous Earth Engine round-trip, so
+    repeated map renders over the same region should only pay it once.
+
+    Args:
+        serialized_region: Output of ee.Geometry.serialize()
+
+    Returns:
+        GeoJSON dict of the region's bounding geometry
+    """
+    region = ee.deserializer.fromJSON(serialized_region)
+    return region.bounds().getInfo()
+
+
 class ClusteringAnalysis:
     """Perform K-means clustering analysis on satellite embeddings."""
 
@@ -46,17 +108,31 @@ class ClusteringAnalysis:
         self.scale = scale
         self.seed = seed
         self.training = None
+        self._kmeans = None
+        self._centroid_index = None
         self._generate_training_data()
 
     def _generate_training_data(self) -> None:
-        """Generate training data from the embeddings image."""
-        self.training = self.embeddings_image.sample(
-            region=self.region,
-            scale=self.scale,
-            numPixels=self.n_samples,
-            seed=self.seed,
-            geometries=False
-        )
+        """Generate training data from the embeddings image, reusing cached samples."""
+        key = hashlib.sha256(
+            "|".join([
+                self.embeddings_image.serialize(),
+                self.region.serialize(),
+                str(self.n_samples),
+                str(self.scale),
+                str(self.seed),
+            ]).encode()
+        ).hexdigest()
+
+        if key not in _training_cache:
+            _training_cache[key] = self.embeddings_image.sample(
+                region=self.region,
+                scale=self.scale,
+                numPixels=self.n_samples,
+                seed=self.seed,
+                geometries=False
+            )
+        self.training = _training_cache[key]
 
     def get_clusters(self, n_clusters: int) -> ee.Image:
         """
@@ -71,6 +147,98 @@ class ClusteringAnalysis:
         clusterer = ee.Clusterer.wekaKMeans(nClusters=int(n_clusters)).train(self.training)
         return self.embeddings_image.cluster(clusterer)
 
+    def get_clusters_local(self, n_clusters: int) -> ee.Image:
+        """
+        Perform K-means clustering with a locally fitted mini-batch model.
+
+        Unlike get_clusters, which retrains GEE's wekaKMeans server-side on
+        every call, this downloads the training samples once, fits
+        scikit-learn's MiniBatchKMeans locally, and only pushes the centroids
+        back to Earth Engine for the per-pixel nearest-centroid assignment.
+        The fitted model is kept on self._kmeans for reuse.
+
+        Args:
+            n_clusters: Number of clusters
+
+        Returns:
+            Earth Engine image with cluster assignments
+
+        Raises:
+            ImportError: If scikit-learn is not installed
+        """
+        if MiniBatchKMeans is None:
+            raise ImportError(
+                "scikit-learn is required for get_clusters_local; "
+                "install it with: pip install google-satellite-embeddings[perf]"
+            )
+
+        band_names = self.embeddings_image.bandNames().getInfo()
+        features = self.training.getInfo()['features']
+        samples = np.array(
+            [[f['properties'][b] for b in band_names] for f in features],
+            dtype=np.float32
+        )
+
+        self._kmeans = MiniBatchKMeans(
+            n_clusters=int(n_clusters),
+            batch_size=4096,
+            n_init=3,
+            random_state=self.seed
+        ).fit(samples)
+
+        if hnswlib is not None:
+            self._build_centroid_index()
+
+        # Nearest-centroid assignment server-side: squared distance to each
+        # centroid as one band, then argmin across the stack
+        distances = ee.Image.cat([
+            self.embeddings_image
+            .subtract(ee.Image.constant(centroid.tolist()))
+            .pow(2)
+            .reduce(ee.Reducer.sum())
+            for centroid in self._kmeans.cluster_centers_
+        ]).toArray()
+
+        return distances.multiply(-1).arrayArgmax().arrayGet([0]).rename('cluster')
+
+    def _build_centroid_index(self) -> None:
+        """Build an HNSW index over the fitted centroids for fast queries."""
+        centroids = self._kmeans.cluster_centers_
+        index = hnswlib.Index(space='cosine', dim=centroids.shape[1])
+        index.init_index(max_elements=centroids.shape[0], ef_construction=200, M=16)
+        index.add_items(centroids, np.arange(centroids.shape[0]))
+        self._centroid_index = index
+
+    def query_nearest_cluster(self, vec: np.ndarray) -> Tuple[int, float]:
+        """
+        Find the nearest cluster for an embedding vector.
+
+        Answers post-hoc questions like "which cluster does this held-out
+        sample belong to" locally in O(log k), instead of re-running
+        cluster() server-side.
+
+        Args:
+            vec: Embedding vector of shape (bands,)
+
+        Returns:
+            Tuple of (cluster label, cosine distance to its centroid)
+
+        Raises:
+            ImportError: If hnswlib is not installed
+            RuntimeError: If no local model has been fitted yet
+        """
+        if self._centroid_index is None:
+            if hnswlib is None:
+                raise ImportError(
+                    "hnswlib is required for query_nearest_cluster; "
+                    "install it with: pip install google-satellite-embeddings[perf]"
+                )
+            raise RuntimeError("Fit a local model with get_clusters_local first")
+
+        query = np.asarray(vec, dtype=np.float32).reshape(1, -1)
+        labels, distances = self._centroid_index.knn_query(query, k=1)
+        return int(labels[0, 0]), float(distances[0, 0])
+
     def export_clusters(
         self,
         n_clusters: int,
@@ -88,7 +256,12 @@ class ClusteringAnalysis:
         Returns:
             Path to exported file
         """
-        img = self.get_clusters(n_clusters).toInt().clip(self.region)
+        import geemap
+
+        # Labels fit in 8 bits for k <= 256; the narrower dtype cuts GeoTIFF
+        # size and download traffic 4x versus the old int32 export
+        cast = 'toUint8' if n_clusters <= 256 else 'toUint16'
+        img = getattr(self.get_clusters(n_clusters), cast)().clip(self.region)
         geemap.ee_export_image(
             img,
             str(output_path),
@@ -98,6 +271,70 @@ class ClusteringAnalysis:
         )
         return output_path
 
+    def export_clusters_to_gcs(
+        self,
+        n_clusters: int,
+        bucket: str,
+        prefix: str,
+        scale: int = 10,
+        local_dir: Optional[Path] = None,
+        poll_interval: int = 30
+    ) -> Optional[Path]:
+        """
+        Export cluster results to Google Cloud Storage via a batch task.
+
+        export_clusters streams through a synchronous download URL that is
+        capped per request, which becomes the ceiling for large regions.
+        This routes through ee.batch.Export.image.toCloudStorage instead,
+        polls the task to completion, and optionally pulls the result down
+        with a parallel gsutil copy.
+
+        Args:
+            n_clusters: Number of clusters
+            bucket: Name of the destination GCS bucket
+            prefix: File name prefix within the bucket
+            scale: Scale in meters for export
+            local_dir: Optional local directory; when given, the exported
+                files are copied down with gsutil -m cp
+            poll_interval: Seconds between task status polls
+
+        Returns:
+            Path to local_dir if provided, None otherwise
+
+        Raises:
+            RuntimeError: If the export task does not complete successfully
+        """
+        cast = 'toUint8' if n_clusters <= 256 else 'toUint16'
+        img = getattr(self.get_clusters(n_clusters), cast)().clip(self.region)
+
+        task = ee.batch.Export.image.toCloudStorage(
+            image=img,
+            description=f"clusters_k{n_clusters}",
+            bucket=bucket,
+            fileNamePrefix=prefix,
+            scale=scale,
+            region=self.region.getInfo()['coordinates'],
+            maxPixels=1e13
+        )
+        task.start()
+
+        while task.active():
+            time.sleep(poll_interval)
+
+        status = task.status()
+        if status.get('state') != 'COMPLETED':
+            raise RuntimeError(f"Export task failed: {status}")
+
+        if local_dir is not None:
+            local_dir = Path(local_dir)
+            local_dir.mkdir(parents=True, exist_ok=True)
+            subprocess.run(
+                ['gsutil', '-m', 'cp', f'gs://{bucket}/{prefix}*', str(local_dir)],
+                check=True
+            )
+            return local_dir
+        return None
+
     def create_interactive_map(
         self,
         n_clusters: int,
@@ -115,14 +352,16 @@ class ClusteringAnalysis:
         Returns:
             Path to HTML file
         """
+        import geemap.foliumap as geefolium
+
         clustered = self.get_clusters(n_clusters)
 
-        # Get region bounds
-        coords = self.region.bounds().getInfo()['coordinates'][0]
-        lons = [c[0] for c in coords]
-        lats = [c[1] for c in coords]
-        center_lat = (min(lats) + max(lats)) / 2
-        center_lon = (min(lons) + max(lons)) / 2
+        # Get region bounds (cached per serialized geometry)
+        coords = np.asarray(_region_bounds(self.region.serialize())['coordinates'][0])
+        lon_min, lat_min = coords.min(axis=0)
+        lon_max, lat_max = coords.max(axis=0)
+        center_lat = (lat_min + lat_max) / 2
+        center_lon = (lon_min + lon_max) / 2
 
         # Create map
         vis_params = {
@@ -138,26 +377,38 @@ class ClusteringAnalysis:
         )
         m.add_basemap("SATELLITE")
         m.addLayer(clustered.toInt(), vis_params, f"K={n_clusters} clusters")
-        m.fit_bounds([[min(lats), min(lons)], [max(lats), max(lons)]])
+        m.fit_bounds([[lat_min, lon_min], [lat_max, lon_max]])
         m.save(str(output_path))
 
         return output_path
 
     @staticmethod
-    def read_cluster_raster(path: Path) -> Tuple[np.ndarray, tuple, object, object]:
+    def read_cluster_raster(
+        path: Path,
+        window: Optional["rasterio.windows.Window"] = None
+    ) -> Tuple[np.ndarray, tuple, object, object]:
         """
         Read cluster raster from file.
 
         Args:
             path: Path to GeoTIFF file
+            window: Optional rasterio window to read a sub-region instead of
+                loading the entire raster into memory
 
         Returns:
             Tuple of (array, extent, transform, crs)
         """
+        import rasterio
+
         with rasterio.open(path) as src:
-            arr = src.read(1)
-            extent = (src.bounds.left, src.bounds.right, src.bounds.bottom, src.bounds.top)
-            transform = src.transform
+            arr = src.read(1, window=window)
+            if window is not None:
+                left, bottom, right, top = src.window_bounds(window)
+                extent = (left, right, bottom, top)
+                transform = src.window_transform(window)
+            else:
+                extent = (src.bounds.left, src.bounds.right, src.bounds.bottom, src.bounds.top)
+                transform = src.transform
             crs = src.crs
         return arr, extent, transform, crs
 
@@ -167,7 +418,8 @@ class ClusteringAnalysis:
         cluster_values: List[int],
         output_path: Path,
         figsize: Tuple[int, int] = (12, 4),
-        dpi: int = 300
+        dpi: int = 300,
+        fig: Optional["plt.Figure"] = None
     ) -> Path:
         """
         Create multi-panel visualization of different cluster counts.
@@ -178,28 +430,54 @@ class ClusteringAnalysis:
             output_path: Path for output PNG file
             figsize: Figure size (width, height)
             dpi: Resolution in dots per inch
+            fig: Optional existing figure to reuse (cleared before drawing);
+                avoids per-call figure setup when rendering many panels
 
         Returns:
             Path to output PNG file
         """
-        fig, axs = plt.subplots(1, len(cluster_paths), figsize=figsize, constrained_layout=True)
+        import matplotlib.pyplot as plt
+
+        # This path only writes a PNG; force the non-interactive Agg backend
+        # unless the user explicitly opts out
+        if os.environ.get("GSE_INTERACTIVE", "0") != "1":
+            plt.switch_backend("Agg")
+
+        own_fig = fig is None
+        if own_fig:
+            fig, axs = plt.subplots(
+                1, len(cluster_paths), figsize=figsize,
+                sharex=True, sharey=True, constrained_layout=True
+            )
+        else:
+            fig.clf()
+            axs = fig.subplots(1, len(cluster_paths), sharex=True, sharey=True)
 
         if len(cluster_paths) == 1:
             axs = [axs]
 
-        for ax, path, k in zip(axs, cluster_paths, cluster_values):
-            arr, _, _, _ = ClusteringAnalysis.read_cluster_raster(path)
-
-            cmap = ListedColormap(KELLY_COLORS[:k])
-            bounds = np.arange(-0.5, k + 0.5, 1)
-            norm = BoundaryNorm(bounds, cmap.N)
-
-            ax.imshow(arr, cmap=cmap, norm=norm)
+        # rasterio releases the GIL, so the per-K reads overlap on a thread pool
+        with ThreadPoolExecutor() as pool:
+            arrays = list(pool.map(
+                lambda p: ClusteringAnalysis.read_cluster_raster(p)[0],
+                cluster_paths
+            ))
+
+        for ax, arr, k in zip(axs, arrays, cluster_values):
+            # Map labels to colors with one vectorized palette gather instead
+            # of per-panel colormap normalization; the palette holds at most
+            # the 22 Kelly colors, so clamp to its real length and let labels
+            # beyond it share the last color as the colormap path did
+            palette = _palette_for_k(k)
+            rgba = palette[np.clip(arr, 0, len(palette) - 1).astype(np.intp)]
+
+            ax.imshow(rgba, interpolation='nearest', rasterized=True)
             ax.set_title(f"K = {k}")
             ax.set_xticks([])
             ax.set_yticks([])
 
-        plt.savefig(output_path, dpi=dpi, bbox_inches="tight")
-        plt.close(fig)
+        fig.savefig(output_path, dpi=dpi, bbox_inches="tight")
+        if own_fig:
+            plt.close(fig)
 
         return output_path
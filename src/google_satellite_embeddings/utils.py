@@ -51,6 +51,59 @@ def get_satellite_embeddings(
     )
 
 
+def normalize_embeddings(img: ee.Image) -> ee.Image:
+    """
+    Scale embedding bands to unit L2 norm per pixel.
+
+    Normalizing once up front lets repeated cosine comparisons against the
+    same image degenerate to plain dot products (see the assume_normalized
+    flag on ChangeDetectionAnalysis.compute_cosine_similarity).
+
+    Args:
+        img: Earth Engine image with embedding bands
+
+    Returns:
+        Image with the same bands divided by the per-pixel L2 norm
+    """
+    norm = img.pow(2).reduce(ee.Reducer.sum()).sqrt()
+    return img.divide(norm)
+
+
+def quantize_embeddings(img: ee.Image, region: ee.Geometry, scale: int = 10) -> ee.Image:
+    """
+    Linearly quantize embedding bands to int8 for compact exports.
+
+    Change-detection metrics (absolute difference, cosine) tolerate 8-bit
+    precision on the bounded embedding values, and int8 exports halve or
+    quarter both file size and the bytes moved through local kernels.
+
+    Args:
+        img: Earth Engine image with embedding bands
+        region: Region over which to compute per-band min/max
+        scale: Scale in meters for the min/max reduction
+
+    Returns:
+        Int8 image in [-127, 127], with the per-band min/max stored in the
+        'quantization' property for round-tripping back to floats
+    """
+    stats = img.reduceRegion(
+        reducer=ee.Reducer.minMax(),
+        geometry=region,
+        scale=scale,
+        bestEffort=True
+    )
+    band_names = img.bandNames()
+    mins = stats.toImage(band_names.map(lambda b: ee.String(b).cat('_min')))
+    maxs = stats.toImage(band_names.map(lambda b: ee.String(b).cat('_max')))
+
+    unit = img.subtract(mins).divide(maxs.subtract(mins))
+    return (
+        unit.multiply(254).subtract(127).round().toInt8()
+        .rename(band_names)
+        .set('quantization', stats)
+    )
+
+
 def create_region(xmin: float, ymin: float, xmax: float, ymax: float) -> ee.Geometry:
     """
     Create an Earth Engine geometry from bounding box coordinates.